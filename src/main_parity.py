@@ -1,16 +1,25 @@
 import argparse
+import collections
+import concurrent.futures
+import contextlib
+import datetime as dt
+import itertools
+import math
+import multiprocessing
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
 from parity.data import (
     get_spot_and_dividends, get_rf_irx, list_expiries, load_option_chain,
-    time_to_expiry_years, pv_of_dividends, _now_utc_naive
+    time_to_expiry_years, dividend_schedule, days_until, pv_of_dividends, _now_utc_naive
 )
-from parity.parity import compute_row
+from parity.parity import chain_arrays, compute_arrays
 
 def parse_args():
     p = argparse.ArgumentParser(description="Put–Call Parity Checker")
@@ -22,30 +31,61 @@ def parse_args():
     p.add_argument("--rf_override", type=float, default=None, help="Annual risk-free rate override (e.g., 0.045)")
     p.add_argument("--stock_spread_cents", type=float, default=1.0, help="Assumed stock bid-ask spread (cents)")
     p.add_argument("--plots", action="store_true", help="Save plots")
+    p.add_argument("--async_http", action="store_true",
+                   help="Prefetch all option chains concurrently over httpx instead of yfinance")
+    p.add_argument("--csv", action="store_true", help="Also write strike-level results as CSV (Parquet is always written)")
     return p.parse_args()
 
 def choose_expiries(ticker: str, expiries: Optional[List[str]], min_dte: int, max_dte: int) -> List[str]:
     if expiries:
         return expiries
     all_exps = list_expiries(ticker)
+    if not all_exps:
+        return []
     now = _now_utc_naive()
-    kept = []
-    for e in all_exps:
-        dte = (pd.to_datetime(e).to_pydatetime() - now).days
-        if dte >= min_dte and dte <= max_dte:
-            kept.append(e)
-    return kept[:20]
-
-def process_expiry(ticker: str, expiry: str, spot: float, rf: float, div_series: pd.Series,
-                   use_dividends: bool, stock_spread_cents: float, out_dir: str) -> pd.DataFrame:
-    calls, puts = load_option_chain(ticker, expiry)
+    exp_dt = pd.to_datetime(pd.Index(all_exps))
+    dte = (exp_dt - pd.Timestamp(now)).days.to_numpy()
+    return [all_exps[i] for i in np.flatnonzero((dte >= min_dte) & (dte <= max_dte))[:20]]
+
+def _merge_on_strike(c: pd.DataFrame, p: pd.DataFrame) -> pd.DataFrame:
+    # Inner join on strike via sorted intersection; chains normally arrive strike-sorted with
+    # unique strikes. Duplicate or NaN strikes take the general pd.merge path instead.
+    if not (c["strike"].is_unique and p["strike"].is_unique) or c["strike"].isna().any() or p["strike"].isna().any():
+        return pd.merge(c, p, on="strike", how="inner")
+    if not c["strike"].is_monotonic_increasing:
+        c = c.sort_values("strike", kind="stable")
+    if not p["strike"].is_monotonic_increasing:
+        p = p.sort_values("strike", kind="stable")
+    c_strikes = c["strike"].to_numpy()
+    p_strikes = p["strike"].to_numpy()
+    shared = np.intersect1d(c_strikes, p_strikes, assume_unique=True)
+    left = c.iloc[np.searchsorted(c_strikes, shared)].reset_index(drop=True)
+    right = p.iloc[np.searchsorted(p_strikes, shared)].drop(columns=["strike"]).reset_index(drop=True)
+    # Same suffixes pd.merge would apply, so output columns are unchanged.
+    overlap = left.columns.intersection(right.columns)
+    left = left.rename(columns={k: f"{k}_x" for k in overlap})
+    right = right.rename(columns={k: f"{k}_y" for k in overlap})
+    return pd.concat([left, right], axis=1)
+
+def write_results(df: pd.DataFrame, path_stem: str, write_csv: bool = False):
+    df.to_parquet(f"{path_stem}.parquet", compression="zstd", index=False)
+    if write_csv:
+        df.to_csv(f"{path_stem}.csv", index=False)
+
+def process_expiry(ticker: str, expiry: str, chain: Tuple[pd.DataFrame, pd.DataFrame],
+                   spot: float, rf: float, dividends: Tuple[np.ndarray, np.ndarray], as_of: dt.date,
+                   use_dividends: bool, stock_spread_cents: float, out_dir: str, write_csv: bool = False,
+                   expiry_ts: Optional[pd.Timestamp] = None) -> Dict[str, np.ndarray]:
+    """Column arrays for one fetched expiry (empty dict if no chain); also writes the per-expiry file. Main thread only."""
+    calls, puts = chain
     if calls.empty or puts.empty:
-        return pd.DataFrame()
+        return {}
 
-    tau = time_to_expiry_years(expiry)
+    tau = time_to_expiry_years(expiry_ts if expiry_ts is not None else expiry)
+    disc = math.exp(-rf * tau)
     pv_div = 0.0
     if use_dividends:
-        pv_div = pv_of_dividends(div_series, _now_utc_naive(), expiry, rf)
+        pv_div = pv_of_dividends(*dividends, days_until(expiry, as_of), rf)
 
     c = calls.rename(columns={
         "bid":"call_bid", "ask":"call_ask", "lastPrice":"call_lastPrice"
@@ -53,76 +93,78 @@ def process_expiry(ticker: str, expiry: str, spot: float, rf: float, div_series:
     p = puts.rename(columns={
         "bid":"put_bid", "ask":"put_ask", "lastPrice":"put_lastPrice"
     })[["strike","put_bid","put_ask","put_lastPrice","volume","openInterest"]]
-    df = pd.merge(c, p, on="strike", how="inner")
+    df = _merge_on_strike(c, p)
 
-    common = dict(S=spot, tau=tau, r=rf, pv_div=pv_div, stock_spread_cents=stock_spread_cents)
+    cols = chain_arrays(df)
+    df["gap_mid"], df["gap_exec"] = compute_arrays(
+        **cols, S=spot, tau=tau, r=rf, pv_div=pv_div, stock_spread_cents=stock_spread_cents, disc=disc
+    )
+    df["expiry"] = expiry
+    df["tau_years"] = tau
+    df["rf_annual"] = rf
+    df["pv_div"] = pv_div
 
-    results = []
-    for _, row in df.iterrows():
-        metrics = compute_row(row, common)
-        out = {**row.to_dict(), **metrics}
-        out["expiry"] = expiry
-        out["tau_years"] = tau
-        out["rf_annual"] = rf
-        out["pv_div"] = pv_div
-        results.append(out)
-
-    out_df = pd.DataFrame(results)
     os.makedirs(out_dir, exist_ok=True)
-    out_df.to_csv(os.path.join(out_dir, f"parity_{ticker}_{expiry}.csv"), index=False)
-    return out_df
+    write_results(df, os.path.join(out_dir, f"parity_{ticker}_{expiry}"), write_csv)
+    return {k: df[k].to_numpy() for k in df.columns}
 
-def make_plots(all_df: pd.DataFrame, ticker: str, out_root: str):
-    if all_df.empty:
-        return
-    os.makedirs(out_root, exist_ok=True)
+def _save_axes(fig, ax, path: str, title: str, xlabel: str, ylabel: str):
+    ax.set_title(title)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    fig.tight_layout()
+    fig.savefig(path)
+    ax.cla()
 
-    plt.figure()
-    all_df["gap_mid"].dropna().hist(bins=60)
-    plt.title(f"{ticker}: Δ_mid distribution (all expiries)")
-    plt.xlabel("Δ_mid (USD)")
-    plt.ylabel("Count")
-    plt.tight_layout()
-    plt.savefig(os.path.join(out_root, f"{ticker}_gap_mid_hist.png"))
-    plt.close()
-
-    plt.figure()
-    all_df["gap_exec"].dropna().hist(bins=60)
-    plt.title(f"{ticker}: Δ_exec distribution (all expiries)")
-    plt.xlabel("Δ_exec (USD)")
-    plt.ylabel("Count")
-    plt.tight_layout()
-    plt.savefig(os.path.join(out_root, f"{ticker}_gap_exec_hist.png"))
-    plt.close()
-
-    for expiry, grp in all_df.groupby("expiry"):
-        if grp.empty: 
-            continue
-        plt.figure()
-        plt.scatter(grp["strike"], grp["gap_mid"], s=10, alpha=0.6)
-        plt.title(f"{ticker}: Δ_mid vs Strike ({expiry})")
-        plt.xlabel("Strike")
-        plt.ylabel("Δ_mid (USD)")
-        plt.tight_layout()
-        safe_exp = expiry.replace(":","-")
-        plt.savefig(os.path.join(out_root, f"{ticker}_{safe_exp}_gap_mid_vs_strike.png"))
-        plt.close()
+_FIG_AX = None
+
+def _axes():
+    # One figure/canvas per process, reused for every plot; the axes are cleared between saves.
+    global _FIG_AX
+    if _FIG_AX is None:
+        _FIG_AX = plt.subplots(figsize=(6, 4))
+    return _FIG_AX
+
+def plot_gap_hist(values: np.ndarray, ticker: str, label: str, out_root: str):
+    fig, ax = _axes()
+    values = values[np.isfinite(values)]
+    counts, edges = np.histogram(values, bins=60)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align="edge")
+    ax.grid(True)
+    _save_axes(fig, ax, os.path.join(out_root, f"{ticker}_gap_{label}_hist.png"),
+               f"{ticker}: Δ_{label} distribution (all expiries)", f"Δ_{label} (USD)", "Count")
+
+def plot_gap_vs_strike(strike: np.ndarray, gap_mid: np.ndarray, ticker: str, expiry: str, out_root: str):
+    if len(strike) == 0:
+        return
+    fig, ax = _axes()
+    ax.scatter(strike, gap_mid, s=10, alpha=0.6)
+    safe_exp = expiry.replace(":","-")
+    _save_axes(fig, ax, os.path.join(out_root, f"{ticker}_{safe_exp}_gap_mid_vs_strike.png"),
+               f"{ticker}: Δ_mid vs Strike ({expiry})", "Strike", "Δ_mid (USD)")
 
 def summarize(all_df: pd.DataFrame) -> pd.DataFrame:
     if all_df.empty:
         return pd.DataFrame()
     th_small = 0.01
     th_medium = 0.05
-    def pct(x): 
-        return 100.0 * x.mean() if len(x) else 0.0
-    grp = all_df.groupby("expiry").apply(lambda g: pd.Series({
-        "n_strikes": len(g),
-        "pct_|Δ_mid|>1c": pct(g["gap_mid"].abs() > th_small),
-        "pct_|Δ_mid|>5c": pct(g["gap_mid"].abs() > th_medium),
-        "pct_Δ_exec>0": pct(g["gap_exec"] > 0.0),
-        "avg_|Δ_mid|": g["gap_mid"].abs().mean(),
-        "max_|Δ_mid|": g["gap_mid"].abs().max(),
-    })).reset_index()
+    abs_gap_mid = all_df["gap_mid"].abs()
+    df = all_df.assign(
+        abs_gap_mid=abs_gap_mid,
+        _gt1c=abs_gap_mid > th_small,
+        _gt5c=abs_gap_mid > th_medium,
+        _exec_pos=all_df["gap_exec"] > 0.0,
+    )
+    grp = df.groupby("expiry", sort=False).agg(**{
+        "n_strikes": ("strike", "size"),
+        "pct_|Δ_mid|>1c": ("_gt1c", "mean"),
+        "pct_|Δ_mid|>5c": ("_gt5c", "mean"),
+        "pct_Δ_exec>0": ("_exec_pos", "mean"),
+        "avg_|Δ_mid|": ("abs_gap_mid", "mean"),
+        "max_|Δ_mid|": ("abs_gap_mid", "max"),
+    }).reset_index()
+    pct_cols = ["pct_|Δ_mid|>1c", "pct_|Δ_mid|>5c", "pct_Δ_exec>0"]
+    grp[pct_cols] *= 100.0
     return grp
 
 def main():
@@ -141,32 +183,74 @@ def main():
 
     print("[3/5] Getting risk-free rate ...")
     rf = args.rf_override if args.rf_override is not None else get_rf_irx()
+    as_of = _now_utc_naive().date()
+    expiry_ts = dict(zip(expiries, pd.to_datetime(pd.Index(expiries))))
+
+    chains = {}
+    if args.async_http:
+        from parity.async_data import load_option_chains
+        chains = load_option_chains([(ticker, e) for e in expiries])
+        if len(chains) < len(expiries):
+            print(f"  httpx fetch failed for {len(expiries) - len(chains)} expiries; using yfinance for those")
+    dividends = dividend_schedule(div_series, as_of)
 
     print("[4/5] Processing expiries ...")
-    all_parts = []
-    for e in expiries:
-        print(f"  - {e}")
-        part = process_expiry(
-            ticker=ticker, expiry=e, spot=spot, rf=rf, div_series=div_series,
-            use_dividends=args.use_dividends, stock_spread_cents=args.stock_spread_cents, out_dir=out_root
-        )
-        if not part.empty:
-            all_parts.append(part)
-    all_df = pd.concat(all_parts, ignore_index=True) if all_parts else pd.DataFrame()
-    if all_df.empty:
-        raise SystemExit("No option rows produced. (Illiquid ticker/expiry or API limits?)")
+    parts = {}
+    plot_futures = []
+    with contextlib.ExitStack() as stack:
+        # Plots render in worker processes while the fetch threads keep downloading. Workers are
+        # spawned, never forked: by the first submit this process already runs fetch threads.
+        plot_pool = None
+        if args.plots:
+            plot_pool = stack.enter_context(concurrent.futures.ProcessPoolExecutor(
+                max_workers=max(1, (os.cpu_count() or 2) // 2),
+                mp_context=multiprocessing.get_context("spawn"),
+            ))
+        # Only the network fetch runs on the pool; parity math stays on the main thread, since
+        # launching Numba's parallel kernel from pool threads hangs interpreter exit under TBB.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(expiries), 10)) as ex:
+            futures = {
+                ex.submit(load_option_chain, ticker, e): e
+                for e in expiries if (ticker, e) not in chains
+            }
+            prefetched = [(e, chains[(ticker, e)]) for e in expiries if (ticker, e) in chains]
+            fetched = ((futures[fut], fut.result()) for fut in concurrent.futures.as_completed(futures))
+            for e, chain in itertools.chain(prefetched, fetched):
+                print(f"  - {e}")
+                part = parts[e] = process_expiry(
+                    ticker=ticker, expiry=e, chain=chain, spot=spot, rf=rf, dividends=dividends, as_of=as_of,
+                    use_dividends=args.use_dividends, stock_spread_cents=args.stock_spread_cents, out_dir=out_root,
+                    write_csv=args.csv, expiry_ts=expiry_ts[e]
+                )
+                if plot_pool is not None and part:
+                    plot_futures.append(plot_pool.submit(
+                        plot_gap_vs_strike, part["strike"], part["gap_mid"], ticker, e, out_root
+                    ))
+        # One concatenation per column (in expiry order) instead of concatenating DataFrames.
+        columns = collections.defaultdict(list)
+        for e in expiries:
+            for k, v in parts[e].items():
+                columns[k].append(v)
+        all_df = pd.DataFrame({k: np.concatenate(v) for k, v in columns.items()})
+        if all_df.empty:
+            raise SystemExit("No option rows produced. (Illiquid ticker/expiry or API limits?)")
+
+        if plot_pool is not None:
+            for label in ("mid", "exec"):
+                plot_futures.append(plot_pool.submit(
+                    plot_gap_hist, all_df[f"gap_{label}"].to_numpy(), ticker, label, out_root
+                ))
 
-    combined_path = os.path.join("outputs", f"parity_results_{ticker}.csv")
-    all_df.to_csv(combined_path, index=False)
+        write_results(all_df, os.path.join("outputs", f"parity_results_{ticker}"), args.csv)
 
-    print("[5/5] Summarizing ...")
-    summary = summarize(all_df)
-    summary_path = os.path.join("outputs", f"summary_{ticker}.csv")
-    summary.to_csv(summary_path, index=False)
-    print(summary)
+        print("[5/5] Summarizing ...")
+        summary = summarize(all_df)
+        summary_path = os.path.join("outputs", f"summary_{ticker}.csv")
+        summary.to_csv(summary_path, index=False)
+        print(summary)
 
-    if args.plots:
-        make_plots(all_df, ticker, out_root)
+        for fut in plot_futures:
+            fut.result()
 
     print("Done. See outputs/ for CSVs and plots.")
 
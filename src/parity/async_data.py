@@ -0,0 +1,57 @@
+import asyncio
+import calendar
+import datetime as dt
+from typing import Dict, List, Sequence, Tuple
+
+import pandas as pd
+import httpx
+
+from parity.data import OPTION_FIELDS
+
+try:
+    import h2  # noqa: F401  (httpx only speaks HTTP/2 when h2 is installed)
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+_OPTIONS_URL = "https://query2.finance.yahoo.com/v7/finance/options/{ticker}"
+_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+Chain = Tuple[pd.DataFrame, pd.DataFrame]
+
+def _epoch(expiry: str) -> int:
+    return calendar.timegm(dt.date.fromisoformat(expiry).timetuple())
+
+def _frame(contracts: List[dict]) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(contracts).reindex(columns=OPTION_FIELDS)
+    df["lastTradeDate"] = pd.to_datetime(df["lastTradeDate"], unit="s")
+    return df.sort_values("strike", kind="stable").reset_index(drop=True)
+
+def _parse(payload: dict) -> Chain:
+    result = (payload.get("optionChain") or {}).get("result") or []
+    options = result[0].get("options") if result else None
+    if not options:
+        return _frame([]), _frame([])
+    return _frame(options[0].get("calls", [])), _frame(options[0].get("puts", []))
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(http2=_HTTP2, headers=_HEADERS, timeout=20.0,
+                             limits=httpx.Limits(max_connections=20))
+
+async def fetch_option_chain(client: httpx.AsyncClient, ticker: str, expiry: str) -> Chain:
+    r = await client.get(_OPTIONS_URL.format(ticker=ticker), params={"date": _epoch(expiry)})
+    r.raise_for_status()
+    return _parse(r.json())
+
+def load_option_chains(jobs: Sequence[Tuple[str, str]]) -> Dict[Tuple[str, str], Chain]:
+    """Fetch every (ticker, expiry) chain concurrently; blocking wrapper around asyncio.gather.
+
+    Jobs that fail (e.g. Yahoo answering 401 without a cookie/crumb) are left out of the
+    result, so callers can fall back to the yfinance path for them.
+    """
+    async def _run():
+        async with _client() as client:
+            chains = await asyncio.gather(*[fetch_option_chain(client, t, e) for t, e in jobs],
+                                          return_exceptions=True)
+        return {job: chain for job, chain in zip(jobs, chains) if not isinstance(chain, Exception)}
+    return asyncio.run(_run())
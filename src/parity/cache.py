@@ -0,0 +1,40 @@
+import contextlib
+import functools
+import os
+import pickle
+import re
+import time
+from typing import Callable
+
+CACHE_DIR = os.path.join("outputs", ".cache")
+
+def disk_cache(ttl_seconds: float, key: Callable[..., tuple]):
+    """Pickle results under CACHE_DIR; entries older than ttl_seconds (by mtime) are refetched.
+
+    ``key`` receives the wrapped function's arguments and returns the parts of the cache key.
+    Cache read/write failures never propagate: the call just falls through to ``fn``.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            name = "_".join(str(p) for p in (fn.__name__, *key(*args, **kwargs)))
+            path = os.path.join(CACHE_DIR, re.sub(r"[^A-Za-z0-9._-]", "_", name) + ".pkl")
+            try:
+                if time.time() - os.path.getmtime(path) < ttl_seconds:
+                    with open(path, "rb") as f:
+                        return pickle.load(f)
+            except Exception:  # missing, truncated or unpicklable (e.g. after a pandas upgrade)
+                pass
+            value = fn(*args, **kwargs)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with open(tmp, "wb") as f:
+                    pickle.dump(value, f)
+                os.replace(tmp, path)
+            except Exception:  # unwritable dir or unpicklable value
+                with contextlib.suppress(OSError):
+                    os.remove(tmp)
+            return value
+        return wrapper
+    return decorator
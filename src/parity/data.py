@@ -1,16 +1,45 @@
 import datetime as dt
+import functools
 from dateutil import tz
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 import yfinance as yf
 
+from parity.cache import disk_cache
+
+try:  # yfinance >= 0.2.54 talks to Yahoo through curl_cffi
+    from curl_cffi import requests as curl_requests
+except ImportError:
+    curl_requests = None
+
+def _make_session():
+    if curl_requests is not None:
+        return curl_requests.Session(impersonate="chrome")
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50))
+    return session
+
+# One keep-alive session shared by every Ticker, so concurrent fetches reuse pooled connections.
+_SESSION = _make_session()
+
+_TICKER_CACHE = {}
+
+def _ticker(ticker: str) -> yf.Ticker:
+    tkr = _TICKER_CACHE.get(ticker)
+    if tkr is None:
+        tkr = _TICKER_CACHE.setdefault(ticker, yf.Ticker(ticker, session=_SESSION))
+    return tkr
+
 def _now_utc_naive() -> dt.datetime:
     return dt.datetime.utcnow().replace(tzinfo=None)
 
+@disk_cache(ttl_seconds=60, key=lambda ticker, lookback_days=5: (ticker, dt.date.today(), lookback_days))
 def get_spot_and_dividends(ticker: str, lookback_days: int = 5) -> Tuple[float, pd.Series]:
-    tkr = yf.Ticker(ticker)
+    tkr = _ticker(ticker)
     hist = tkr.history(period=f"{max(lookback_days,1)}d")
     if hist.empty:
         raise RuntimeError(f"No price history for {ticker}.")
@@ -22,44 +51,62 @@ def get_spot_and_dividends(ticker: str, lookback_days: int = 5) -> Tuple[float,
         div.index = pd.to_datetime(div.index).tz_localize(None)
     return spot, div
 
-def get_rf_irx() -> float:
-    irx = yf.Ticker("^IRX").history(period="10d")
+@disk_cache(ttl_seconds=3600, key=lambda: (dt.date.today(),))
+def _irx_rate() -> float:
+    irx = _ticker("^IRX").history(period="10d")
     if irx.empty:
-        return 0.03
+        raise RuntimeError("No price history for ^IRX.")
     last = float(irx["Close"].iloc[-1])
     return last / 100.0
 
+def get_rf_irx() -> float:
+    # The fallback lives outside the cached call so a failed fetch is retried next run.
+    try:
+        return _irx_rate()
+    except RuntimeError:
+        return 0.03
+
+@disk_cache(ttl_seconds=600, key=lambda ticker: (ticker, dt.date.today()))
 def list_expiries(ticker: str) -> List[str]:
-    tkr = yf.Ticker(ticker)
+    tkr = _ticker(ticker)
     opts = tkr.options or []
     return list(opts)
 
-def load_option_chain(ticker: str, expiry: str):
-    tkr = yf.Ticker(ticker)
+# Per-contract fields used downstream; everything else in yfinance's OptionChain is dropped.
+OPTION_FIELDS = ["strike", "bid", "ask", "lastPrice", "volume", "openInterest", "lastTradeDate"]
+
+def _project_chain(df: pd.DataFrame) -> pd.DataFrame:
+    out = df[[c for c in OPTION_FIELDS if c in df.columns]]
+    if "lastTradeDate" in out.columns:
+        out = out.assign(lastTradeDate=pd.to_datetime(out["lastTradeDate"], utc=True).dt.tz_localize(None))
+    return out
+
+@functools.lru_cache(maxsize=256)
+def load_option_chain(ticker: str, expiry: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # Cached per (ticker, expiry): callers must treat the returned frames as read-only.
+    tkr = _ticker(ticker)
     chain = tkr.option_chain(expiry)
-    calls = chain.calls.copy()
-    puts = chain.puts.copy()
-    for df in [calls, puts]:
-        if "lastTradeDate" in df.columns:
-            df["lastTradeDate"] = pd.to_datetime(df["lastTradeDate"]).dt.tz_localize(None)
-    return calls, puts
-
-def time_to_expiry_years(expiry: str) -> float:
+    return _project_chain(chain.calls), _project_chain(chain.puts)
+
+def time_to_expiry_years(expiry: Union[str, pd.Timestamp]) -> float:
+    # Accepts an already-parsed Timestamp so callers can parse each expiry once.
     now = _now_utc_naive()
-    exp = pd.to_datetime(expiry).to_pydatetime().replace(tzinfo=None)
-    delta = exp - now
+    exp = expiry if isinstance(expiry, pd.Timestamp) else pd.Timestamp(expiry)
+    delta = exp.tz_localize(None) - now
     return max(delta.days, 0) / 365.25
 
-def pv_of_dividends(div_series: pd.Series, start: dt.datetime, expiry: str, r_annual: float) -> float:
+def dividend_schedule(div_series: pd.Series, start: dt.date) -> Tuple[np.ndarray, np.ndarray]:
+    """(days from start to each ex-date, amounts) for reuse across expiries."""
     if div_series is None or div_series.empty:
-        return 0.0
-    exp = pd.to_datetime(expiry).to_pydatetime().replace(tzinfo=None)
-    mask = (div_series.index > start) & (div_series.index <= exp)
-    future_divs = div_series.loc[mask]
-    if future_divs.empty:
-        return 0.0
-    pv = 0.0
-    for ex_date, amt in future_divs.items():
-        t = (ex_date - start).days / 365.25
-        pv += float(amt) * np.exp(-r_annual * max(t, 0.0))
-    return float(pv)
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    div_days = (div_series.index.values.astype("datetime64[D]") - np.datetime64(start, "D")).astype("int64")
+    div_amts = div_series.to_numpy(dtype=np.float64)
+    return div_days, div_amts
+
+def days_until(expiry: str, start: dt.date) -> int:
+    return int((np.datetime64(expiry, "D") - np.datetime64(start, "D")).astype("int64"))
+
+def pv_of_dividends(div_days: np.ndarray, div_amts: np.ndarray, expiry_days: int, r_annual: float) -> float:
+    mask = (div_days > 0) & (div_days <= expiry_days)
+    t = div_days[mask] / 365.25
+    return float((div_amts[mask] * np.exp(-r_annual * t)).sum())
@@ -1,10 +1,18 @@
 import math
 from dataclasses import dataclass
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 
 import numpy as np
 import pandas as pd
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; compute_frame falls back to NumPy
+    njit = None
+
+# fastmath without "nnan"/"ninf": missing quotes arrive as NaN and must be detected.
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
 @dataclass
 class ParityInputs:
     S: float
@@ -19,6 +27,7 @@ class ParityInputs:
     P_ask: float
     pv_div: float = 0.0
     stock_spread_cents: float = 1.0
+    disc: Optional[float] = None  # exp(-r*tau); precomputed once per expiry when available
 
 def _safe_mid(bid: float, ask: float, last: float = None) -> float:
     vals = [v for v in [bid, ask] if v is not None and np.isfinite(v) and v > 0]
@@ -28,11 +37,33 @@ def _safe_mid(bid: float, ask: float, last: float = None) -> float:
         return float(last)
     return np.nan
 
-def theoretical_rhs(S: float, K: float, tau: float, r: float, pv_div: float = 0.0) -> float:
-    return S - K * math.exp(-r * tau) - pv_div
+def _safe_mid_vec(bid: np.ndarray, ask: np.ndarray, last: np.ndarray) -> np.ndarray:
+    both = np.isfinite(bid) & np.isfinite(ask) & (bid > 0) & (ask > 0)
+    last_ok = np.isfinite(last) & (last > 0)
+    return np.where(both, 0.5 * (bid + ask), np.where(last_ok, last, np.nan))
+
+def _quote(v) -> float:
+    return np.nan if v is None else float(v)
+
+def _bid_or0(v: float) -> float:
+    # A missing bid still sells for 0.
+    return 0.0 if v is None or not np.isfinite(v) else v
+
+def _ask_or_nan(v: float) -> float:
+    # A missing (or zero) ask cannot be bought, so the executable gap is undefined.
+    return v if v is not None and np.isfinite(v) and v > 0 else np.nan
+
+def theoretical_rhs(S: float, K: float, tau: float, r: float, pv_div: float = 0.0,
+                    disc: Optional[float] = None) -> float:
+    if disc is None:
+        disc = math.exp(-r * tau)
+    return S - K * disc - pv_div
+
+def _disc(pi: ParityInputs) -> float:
+    return pi.disc if pi.disc is not None else math.exp(-pi.r * pi.tau)
 
 def parity_gap_mid(pi: ParityInputs) -> float:
-    rhs = theoretical_rhs(pi.S, pi.K, pi.tau, pi.r, pi.pv_div)
+    rhs = theoretical_rhs(pi.S, pi.K, pi.tau, pi.r, pi.pv_div, disc=_disc(pi))
     return (pi.C_mid - pi.P_mid) - rhs
 
 def parity_gap_executable(pi: ParityInputs, direction_hint: Optional[str] = None) -> float:
@@ -40,17 +71,19 @@ def parity_gap_executable(pi: ParityInputs, direction_hint: Optional[str] = None
     S_bid = pi.S - stock_half_spread
     S_ask = pi.S + stock_half_spread
 
+    K_disc = pi.K * _disc(pi)
+
     gap_mid = parity_gap_mid(pi) if direction_hint is None else None
     go_A = (gap_mid is not None and gap_mid > 0) or direction_hint == "A"
     go_B = (gap_mid is not None and gap_mid < 0) or direction_hint == "B"
 
     if go_A:
-        lhs_exec = (pi.C_bid or 0.0) - (pi.P_ask or 0.0)
-        rhs_exec = (S_ask - (pi.K * math.exp(-pi.r * pi.tau)) - pi.pv_div)
+        lhs_exec = _bid_or0(pi.C_bid) - _ask_or_nan(pi.P_ask)
+        rhs_exec = (S_ask - K_disc - pi.pv_div)
         return lhs_exec - rhs_exec
     elif go_B:
-        lhs_exec = (S_bid - (pi.K * math.exp(-pi.r * pi.tau)) - pi.pv_div)
-        rhs_exec = ((pi.C_ask or 0.0) - (pi.P_bid or 0.0))
+        lhs_exec = (S_bid - K_disc - pi.pv_div)
+        rhs_exec = (_ask_or_nan(pi.C_ask) - _bid_or0(pi.P_bid))
         return lhs_exec - rhs_exec
     else:
         return 0.0
@@ -62,13 +95,98 @@ def compute_row(row: pd.Series, common: Dict) -> Dict:
         S=common["S"], K=float(row["strike"]), tau=common["tau"], r=common["r"],
         C_mid=float(C_mid) if np.isfinite(C_mid) else np.nan,
         P_mid=float(P_mid) if np.isfinite(P_mid) else np.nan,
-        C_bid=float(row.get("call_bid") or np.nan),
-        C_ask=float(row.get("call_ask") or np.nan),
-        P_bid=float(row.get("put_bid") or np.nan),
-        P_ask=float(row.get("put_ask") or np.nan),
+        C_bid=_quote(row.get("call_bid")),
+        C_ask=_quote(row.get("call_ask")),
+        P_bid=_quote(row.get("put_bid")),
+        P_ask=_quote(row.get("put_ask")),
         pv_div=float(common.get("pv_div", 0.0) or 0.0),
         stock_spread_cents=float(common.get("stock_spread_cents", 1.0) or 1.0),
+        disc=common.get("disc"),
     )
     gap_mid = parity_gap_mid(pi)
     gap_exec = parity_gap_executable(pi)
     return {"gap_mid": gap_mid, "gap_exec": gap_exec}
+
+def _gaps_numpy(K, C_bid, C_ask, C_last, P_bid, P_ask, P_last,
+                S: float, disc: float, pv_div: float, h: float) -> Tuple[np.ndarray, np.ndarray]:
+    C_mid = _safe_mid_vec(C_bid, C_ask, C_last)
+    P_mid = _safe_mid_vec(P_bid, P_ask, P_last)
+
+    K_disc = K * disc
+    rhs = S - K_disc - pv_div
+    gap_mid = (C_mid - P_mid) - rhs
+
+    # A missing bid sells for 0; a missing (or zero) ask cannot be bought, so that leg's gap is NaN.
+    C_bid, P_bid = (np.nan_to_num(x, nan=0.0) for x in (C_bid, P_bid))
+    C_ask, P_ask = (np.where(x > 0, x, np.nan) for x in (C_ask, P_ask))
+    gap_exec = np.where(gap_mid > 0, (C_bid - P_ask) - ((S + h) - K_disc - pv_div),
+                        np.where(gap_mid < 0, ((S - h) - K_disc - pv_div) - (C_ask - P_bid), 0.0))
+    return gap_mid, gap_exec
+
+if njit is not None:
+    @njit(parallel=True, cache=True, fastmath=_FASTMATH)
+    def _parity_kernel(strike, c_bid, c_ask, c_last, p_bid, p_ask, p_last,
+                       S, disc, pv_div, half_spread, out_mid, out_exec):
+        # Iterations are independent (each writes only out_*[i]), so prange is race-free.
+        for i in prange(strike.shape[0]):
+            cb, ca, pb, pa = c_bid[i], c_ask[i], p_bid[i], p_ask[i]
+            if cb > 0 and ca > 0 and math.isfinite(cb) and math.isfinite(ca):
+                c_mid = 0.5 * (cb + ca)
+            elif c_last[i] > 0 and math.isfinite(c_last[i]):
+                c_mid = c_last[i]
+            else:
+                c_mid = np.nan
+            if pb > 0 and pa > 0 and math.isfinite(pb) and math.isfinite(pa):
+                p_mid = 0.5 * (pb + pa)
+            elif p_last[i] > 0 and math.isfinite(p_last[i]):
+                p_mid = p_last[i]
+            else:
+                p_mid = np.nan
+
+            K_disc = strike[i] * disc
+            gap_mid = (c_mid - p_mid) - (S - K_disc - pv_div)
+            out_mid[i] = gap_mid
+
+            # Same fill rule as _gaps_numpy: missing bids sell for 0, missing/zero asks give NaN.
+            cb = 0.0 if math.isnan(cb) else cb
+            pb = 0.0 if math.isnan(pb) else pb
+            ca = ca if ca > 0 else np.nan
+            pa = pa if pa > 0 else np.nan
+            if gap_mid > 0:
+                out_exec[i] = (cb - pa) - ((S + half_spread) - K_disc - pv_div)
+            elif gap_mid < 0:
+                out_exec[i] = ((S - half_spread) - K_disc - pv_div) - (ca - pb)
+            else:
+                out_exec[i] = 0.0
+else:
+    _parity_kernel = None
+
+CHAIN_COLUMNS = ("strike", "call_bid", "call_ask", "call_lastPrice", "put_bid", "put_ask", "put_lastPrice")
+
+def compute_arrays(strike: np.ndarray, call_bid: np.ndarray, call_ask: np.ndarray, call_lastPrice: np.ndarray,
+                   put_bid: np.ndarray, put_ask: np.ndarray, put_lastPrice: np.ndarray,
+                   S: float, tau: float, r: float, pv_div: float = 0.0, stock_spread_cents: float = 1.0,
+                   disc: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """gap_mid / gap_exec for float64 column arrays (keyword names match CHAIN_COLUMNS). Main thread only."""
+    h = (stock_spread_cents or 1.0) / 200.0
+    if disc is None:
+        disc = math.exp(-r * tau)
+    arrs = [np.ascontiguousarray(a, dtype=np.float64)
+            for a in (strike, call_bid, call_ask, call_lastPrice, put_bid, put_ask, put_lastPrice)]
+
+    if _parity_kernel is None:
+        return _gaps_numpy(*arrs, S, disc, pv_div, h)
+
+    gap_mid = np.empty_like(arrs[0])
+    gap_exec = np.empty_like(arrs[0])
+    _parity_kernel(*arrs, float(S), float(disc), float(pv_div), h, gap_mid, gap_exec)
+    return gap_mid, gap_exec
+
+def chain_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    return {k: df[k].to_numpy(dtype=np.float64, na_value=np.nan) for k in CHAIN_COLUMNS}
+
+def compute_frame(df: pd.DataFrame, S: float, tau: float, r: float, pv_div: float = 0.0,
+                  stock_spread_cents: float = 1.0, disc: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized gap_mid / gap_exec for every strike of a merged chain at once."""
+    return compute_arrays(**chain_arrays(df), S=S, tau=tau, r=r, pv_div=pv_div,
+                          stock_spread_cents=stock_spread_cents, disc=disc)